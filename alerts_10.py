@@ -14,13 +14,15 @@ ENV:
   TG_BOT_TOKEN, TG_CHAT_ID, ALERTS_NAME (optional)
 """
 
-import os, json, time
-from datetime import datetime, timezone, timedelta
+import os, json, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone, timedelta
 from typing import List, Tuple
 import requests
 
 # ── Config ────────────────────────────────────────────────────────────────────
 COINS=[("BTCUSDT","BTC"),("ETHUSDT","ETH"),("SOLUSDT","SOL"),("BNBUSDT","BNB"),("XRPUSDT","XRP")]
+PRIORITY_RANK={sym:i for i,(_,sym) in enumerate(COINS)}
 THRESHOLDS_PCT={"BTC":13,"ETH":14,"SOL":17,"BNB":20,"XRP":15}
 COIN_TP={"ETH":0.0434,"SOL":0.0787}
 TP_FALLBACK=0.065
@@ -37,21 +39,41 @@ BASES=[
  "https://api3.binance.com","https://data-api.binance.vision"
 ]
 HEADERS={"User-Agent":"alerts10/1.4 (+https://github.com)"}
+SESSION=requests.Session()
+SESSION.headers.update(HEADERS)
+EPOCH=date(1970,1,1)
+MS_PER_DAY=86_400_000
+
+_GOOD_BASE=None                   # last base that answered; tried first
+_GOOD_BASE_LOCK=threading.Lock()
 
 # ── Binance helpers ───────────────────────────────────────────────────────────
 def fetch_klines_daily(symbol:str):
+    global _GOOD_BASE
+    with _GOOD_BASE_LOCK: good=_GOOD_BASE
+    order=[good]+[b for b in BASES if b!=good] if good else BASES
     last=None
-    for base in BASES:
+    for base in order:
         try:
-            r=requests.get(f"{base}/api/v3/klines",
-                           params={"symbol":symbol,"interval":"1d","limit":1500},
-                           headers=HEADERS,timeout=30)
+            r=SESSION.get(f"{base}/api/v3/klines",
+                          params={"symbol":symbol,"interval":"1d","limit":1500},
+                          timeout=30)
             r.raise_for_status()
+            with _GOOD_BASE_LOCK: _GOOD_BASE=base
             return r.json()
         except Exception as e:
             last=e; continue
     raise last if last else RuntimeError("All Binance bases failed")
 
+def fetch_all_klines():
+    """Fetch every coin concurrently → {symbol: klines or the exception raised}."""
+    def one(symbol):
+        try: return fetch_klines_daily(symbol)
+        except Exception as e: return e
+    symbols=[symbol for symbol,_ in COINS]
+    with ThreadPoolExecutor(max_workers=len(symbols)) as ex:
+        return dict(zip(symbols,ex.map(one,symbols)))
+
 def parse_klines(data):
     rows=[]
     for k in data:
@@ -102,6 +124,7 @@ def main():
     except Exception:
         state={"active_until":None,"last_run":None}
     state["last_run"]=datetime.now(timezone.utc).isoformat()
+    klines=fetch_all_klines()
 
     active_until=state.get("active_until")
     if active_until:
@@ -111,7 +134,8 @@ def main():
             # STATUS only
             lines=[]
             for symbol,sym in COINS:
-                data=fetch_klines_daily(symbol)
+                data=klines[symbol]
+                if isinstance(data,Exception): raise data
                 rows=parse_klines(data)
                 closes=all_closed_closes(rows)
                 if len(closes)<2:
@@ -122,7 +146,6 @@ def main():
                 conf=confidence_from_move(abs(dayret),T)
                 emoji="🟢" if dayret>= T else ("🔴" if dayret<= -T else "⚪")
                 lines.append(f"{emoji} {sym} ({conf}%): close {fmt_price(p1)}")
-                time.sleep(0.1)
             post_tg("Status only (active window):\n"+"\n".join(lines)+f"\nActive until: {dt_until.isoformat()}")
             with open(STATE_FILE,"w") as f: json.dump(state,f,default=str,indent=2)
             return
@@ -133,7 +156,8 @@ def main():
     lines=[]; candidates=[]
     for symbol,sym in COINS:
         try:
-            data=fetch_klines_daily(symbol)
+            data=klines[symbol]
+            if isinstance(data,Exception): raise data
             rows=parse_klines(data)
             closes=all_closed_closes(rows)
         except Exception as e:
@@ -154,20 +178,16 @@ def main():
             direction="SHORT" if dayret>0 else "LONG"
             tp=COIN_TP.get(sym,TP_FALLBACK)
             entry=p1
-            entry_date = datetime.utcfromtimestamp(rows[-1]["close_time"]/1000).date()
+            entry_date = EPOCH+timedelta(days=int(rows[-1]["close_time"])//MS_PER_DAY)
             valid_until = datetime.combine(entry_date, datetime.min.time(), tzinfo=timezone.utc)+timedelta(days=HOLD_BARS)
             candidates.append((sym,direction,entry,tp,entry_date,valid_until,conf))
 
-        time.sleep(0.1)
-
     if not candidates:
         post_tg("Status:\n"+"\n".join(lines)+"\nNo trades today.")
         with open(STATE_FILE,"w") as f: json.dump(state,f,default=str,indent=2)
         return
 
-    priority={"BTC":0,"ETH":1,"SOL":2,"BNB":3,"XRP":4}
-    candidates.sort(key=lambda x: priority.get(x[0],99))
-    sym,direction,entry,tp,entry_date,valid_until,conf=candidates[0]
+    sym,direction,entry,tp,entry_date,valid_until,conf=min(candidates,key=lambda x: PRIORITY_RANK.get(x[0],99))
 
     if direction=="LONG":
         sl_price=entry*(1-SL); tp_price=entry*(1+tp)
@@ -15,18 +15,24 @@ ENV:
   TG_BOT_TOKEN, TG_CHAT_ID, ALERTS_NAME (optional)
 """
 
-import os, json, time, math
-from datetime import datetime, timezone, timedelta
+import os, json, math, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone, timedelta
+from pathlib import Path
 from typing import List, Tuple
+import numpy as np
 import requests
 
 # ── Config ────────────────────────────────────────────────────────────────────
 COINS = [("BTCUSDT","BTC"),("ETHUSDT","ETH"),("SOLUSDT","SOL")]
+PRIORITY_RANK = {sym:i for i,(_,sym) in enumerate(COINS)}
 Z_THRESH = 2.5
 SL = 0.03
 HOLD_BARS = 4
 STATE_FILE = "adaptive_alerts_state.json"
 TP_FALLBACK = {"BTC":0.0227,"ETH":0.0167,"SOL":0.0444}
+KLINE_LIMIT = 1500
+CACHE_DIR = Path(".cache/klines")
 
 TG_BOT_TOKEN = os.getenv("TG_BOT_TOKEN")
 TG_CHAT_ID   = os.getenv("TG_CHAT_ID")
@@ -37,64 +43,117 @@ BASES = [
     "https://api3.binance.com","https://data-api.binance.vision"
 ]
 HEADERS = {"User-Agent":"alerts-bot/1.5 (+https://github.com)"}
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+EPOCH = date(1970,1,1)
+MS_PER_DAY = 86_400_000
+
+_GOOD_BASE = None                 # last base that answered; tried first
+_GOOD_BASE_LOCK = threading.Lock()
 
 # ── Binance helpers ───────────────────────────────────────────────────────────
-def fetch_klines_daily(symbol:str):
+def _get_klines(params):
+    global _GOOD_BASE
+    with _GOOD_BASE_LOCK: good=_GOOD_BASE
+    order=[good]+[b for b in BASES if b!=good] if good else BASES
     last=None
-    for base in BASES:
+    for base in order:
         try:
-            r=requests.get(f"{base}/api/v3/klines",
-                           params={"symbol":symbol,"interval":"1d","limit":1500},
-                           headers=HEADERS,timeout=30)
+            r=SESSION.get(f"{base}/api/v3/klines",params=params,timeout=30)
             r.raise_for_status()
+            with _GOOD_BASE_LOCK: _GOOD_BASE=base
             return r.json()
         except Exception as e:
             last=e; continue
     raise last if last else RuntimeError("All Binance bases failed")
 
+def _cache_path(symbol:str):
+    return CACHE_DIR/f"{symbol}_1d.json"
+
+def load_cached_klines(symbol:str):
+    try:
+        with open(_cache_path(symbol),"r") as f: return json.load(f)
+    except Exception:
+        return []
+
+def save_cached_klines(symbol:str, data):
+    CACHE_DIR.mkdir(parents=True,exist_ok=True)
+    with open(_cache_path(symbol),"w") as f: json.dump(data,f)
+
+def fetch_klines_daily(symbol:str):
+    """
+    Daily klines with an on-disk cache. Closed candles never change, so if the
+    newest cached bar is still forming we already hold every CLOSED bar and skip
+    the network; otherwise only the delta from the last cached bar is fetched.
+    """
+    cached=load_cached_klines(symbol)
+    now_ms=int(datetime.now(timezone.utc).timestamp()*1000)
+    if cached and int(cached[-1][6])>now_ms:
+        return cached
+
+    params={"symbol":symbol,"interval":"1d","limit":KLINE_LIMIT}
+    if cached: params["startTime"]=int(cached[-1][0])  # re-fetch the bar that was forming
+    fresh=_get_klines(params)
+    if not fresh: return cached
+
+    first_open=int(fresh[0][0])
+    data=([k for k in cached if int(k[0])<first_open]+fresh)[-KLINE_LIMIT:]
+    try: save_cached_klines(symbol,data)
+    except Exception as e: print("Kline cache write error:",e)
+    return data
+
+def fetch_all_klines():
+    """Fetch every coin concurrently → {symbol: klines or the exception raised}."""
+    def one(symbol):
+        try: return fetch_klines_daily(symbol)
+        except Exception as e: return e
+    symbols=[symbol for symbol,_ in COINS]
+    with ThreadPoolExecutor(max_workers=len(symbols)) as ex:
+        return dict(zip(symbols,ex.map(one,symbols)))
+
 def parse_klines(data):
-    """Return list of dicts with times (ms) and close price."""
-    rows=[]
-    for k in data:
-        rows.append({
-            "open_time": int(k[0]),
-            "close_time": int(k[6]),
-            "close": float(k[4]),
-        })
-    return rows
+    """Return column arrays: open/close times (ms) and close price."""
+    arr=np.array(data,dtype=object).reshape(len(data),-1) if data else np.empty((0,12),dtype=object)
+    return {
+        "open_time": arr[:,0].astype(np.int64),
+        "close_time": arr[:,6].astype(np.int64),
+        "close": arr[:,4].astype(np.float64),
+    }
 
 def all_closed_closes(rows, n=None):
     """Closes for CLOSED bars only (close_time <= now)."""
     now_ms = int(datetime.now(timezone.utc).timestamp()*1000)
-    closed = [r["close"] for r in rows if r["close_time"] <= now_ms]
+    closed = rows["close"][rows["close_time"] <= now_ms]
     return closed if n is None else closed[-n:]
 
 # ── Math / signal ─────────────────────────────────────────────────────────────
 def pct_returns(closes):
-    return [closes[i]/closes[i-1]-1.0 for i in range(1,len(closes))]
+    closes=np.asarray(closes,dtype=np.float64)
+    return closes[1:]/closes[:-1]-1.0
 
 def zscore_series(r, look=20):
-    zs=[]
-    for i in range(len(r)):
-        if i+1<look: zs.append(None); continue
-        w=r[i+1-look:i+1]; mu=sum(w)/len(w)
-        var=sum((x-mu)**2 for x in w)/len(w); sd=var**0.5
-        zs.append(abs((r[i]-mu)/sd) if sd>0 else None)
+    """|z| of each return vs its trailing `look` window; NaN while warming up or if the window is flat."""
+    r=np.asarray(r,dtype=np.float64)
+    zs=np.full(len(r),np.nan)
+    if len(r)<look: return zs
+    w=np.lib.stride_tricks.sliding_window_view(r,look)
+    mu=w.mean(axis=1); sd=w.std(axis=1)  # population sd, as before
+    with np.errstate(divide="ignore",invalid="ignore"):
+        zs[look-1:]=np.where(sd>0,np.abs((r[look-1:]-mu)/sd),np.nan)
     return zs
 
 def phi(x):  # normal CDF without scipy
     return 0.5*(1.0+math.erf(x/math.sqrt(2.0)))
 
 def confidence_from_z(abs_z):
-    if abs_z is None: return 0
+    if abs_z is None or math.isnan(abs_z): return 0
     c=(2*phi(abs_z)-1.0)*100.0
     return max(0,min(100,int(round(c))))
 
 def median(vals):
-    v=sorted([x for x in vals if x is not None])
-    n=len(v)
-    if n==0: return None
-    return v[n//2] if n%2==1 else (v[n//2-1]+v[n//2])/2.0
+    v=[x for x in vals if x is not None]
+    if not v: return None
+    return float(np.median(v))
 
 def median_mfe_for_coin(sym,state):
     hist=state.get("signals",{}).get(sym,[])
@@ -130,6 +189,7 @@ def fmt_price(p):
 # ── Main ──────────────────────────────────────────────────────────────────────
 def main():
     state=load_state(); state["last_run"]=datetime.now(timezone.utc).isoformat()
+    klines=fetch_all_klines()
 
     # Active window → status only
     active_until=state.get("active_until")
@@ -139,18 +199,18 @@ def main():
         if dt_until and datetime.now(timezone.utc)<dt_until:
             lines=[]
             for symbol,sym in COINS:
-                data=fetch_klines_daily(symbol)
+                data=klines[symbol]
+                if isinstance(data,Exception): raise data
                 rows=parse_klines(data)
                 closes=all_closed_closes(rows)
                 if len(closes)<21:
                     lines.append(f"⚪ {sym} (0%): close n/a"); continue
                 r=pct_returns(closes); zs=zscore_series(r,20)
-                close=closes[-1]; ret=r[-1]; az=zs[-1]
-                conf=confidence_from_z(az) if az is not None else 0
-                emoji="🟢" if (az is not None and az>=Z_THRESH and ret>0) else \
-                      "🔴" if (az is not None and az>=Z_THRESH and ret<0) else "⚪"
+                close=closes[-1]; ret=r[-1]; az=float(zs[-1])  # NaN compares False below
+                conf=confidence_from_z(az)
+                emoji="🟢" if (az>=Z_THRESH and ret>0) else \
+                      "🔴" if (az>=Z_THRESH and ret<0) else "⚪"
                 lines.append(f"{emoji} {sym} ({conf}%): close {fmt_price(close)}")
-                time.sleep(0.1)
             post_tg("Status only (active window):\n"+"\n".join(lines)+f"\nActive until: {dt_until.isoformat()}")
             save_state(state); return
         else:
@@ -160,7 +220,8 @@ def main():
     lines=[]; candidates=[]
     for symbol,sym in COINS:
         try:
-            data=fetch_klines_daily(symbol)
+            data=klines[symbol]
+            if isinstance(data,Exception): raise data
             rows=parse_klines(data)
             closes=all_closed_closes(rows)
         except Exception as e:
@@ -171,29 +232,25 @@ def main():
             lines.append(f"⚪ {sym} (0%): close n/a"); continue
 
         r=pct_returns(closes); zs=zscore_series(r,20)
-        close=closes[-1]; ret=r[-1]; az=zs[-1]
-        conf=confidence_from_z(az) if az is not None else 0
-        emoji="🟢" if (az is not None and az>=Z_THRESH and ret>0) else \
-              "🔴" if (az is not None and az>=Z_THRESH and ret<0) else "⚪"
+        close=closes[-1]; ret=r[-1]; az=float(zs[-1])  # NaN compares False below
+        conf=confidence_from_z(az)
+        emoji="🟢" if (az>=Z_THRESH and ret>0) else \
+              "🔴" if (az>=Z_THRESH and ret<0) else "⚪"
         lines.append(f"{emoji} {sym} ({conf}%): close {fmt_price(close)}")
 
-        if az is not None and az>=Z_THRESH:
+        if az>=Z_THRESH:
             direction="SHORT" if ret>0 else "LONG"
             tp=median_mfe_for_coin(sym,state)
             entry=close
-            entry_date = datetime.utcfromtimestamp(rows[-1]["close_time"]/1000).date()
+            entry_date = EPOCH+timedelta(days=int(rows["close_time"][-1])//MS_PER_DAY)
             valid_until = datetime.combine(entry_date, datetime.min.time(), tzinfo=timezone.utc)+timedelta(days=HOLD_BARS)
             candidates.append((sym,direction,entry,tp,entry_date,valid_until,conf))
 
-        time.sleep(0.1)
-
     if not candidates:
         post_tg("Status:\n"+"\n".join(lines)+"\nNo trades today.")
         save_state(state); return
 
-    priority={"BTC":0,"ETH":1,"SOL":2}
-    candidates.sort(key=lambda x: priority.get(x[0],99))
-    sym,direction,entry,tp,entry_date,valid_until,conf=candidates[0]
+    sym,direction,entry,tp,entry_date,valid_until,conf=min(candidates,key=lambda x: PRIORITY_RANK.get(x[0],99))
 
     if direction=="LONG":
         sl_price=entry*(1-SL); tp_price=entry*(1+tp)
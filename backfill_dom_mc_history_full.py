@@ -25,16 +25,16 @@ Notes:
 """
 
 import json
-import time
-from datetime import datetime
+from datetime import date, timedelta
 from pathlib import Path
 
-import requests
+from cg_utils import cg_get
 
 DOCS_ROOT = Path(".")
 OUT_PATH = DOCS_ROOT / "dom_mc_history.json"
 
-COINGECKO = "https://api.coingecko.com/api/v3"
+EPOCH = date(1970, 1, 1)
+MS_PER_DAY = 86_400_000
 
 # Mapping of our symbols -> CoinGecko IDs
 IDS = {
@@ -50,16 +50,6 @@ IDS = {
 }
 
 
-def cg_get(path: str, params=None, timeout: int = 60):
-    if params is None:
-        params = {}
-    url = COINGECKO + path
-    r = requests.get(url, params=params, timeout=timeout)
-    if r.status_code != 200:
-        raise RuntimeError(f"CoinGecko error {r.status_code}: {r.text[:300]}")
-    return r.json()
-
-
 def fetch_mc_series(coin_id: str) -> dict:
     """
     Return { 'YYYY-MM-DD': market_cap_float, ... } for the given CoinGecko ID.
@@ -71,17 +61,17 @@ def fetch_mc_series(coin_id: str) -> dict:
     )
 
     data = js.get("market_caps", [])
-    out = {}
+    by_day = {}
     for ts_ms, mc in data:
-        # CoinGecko returns many points per day; collapse to one per UTC date.
-        dt = datetime.utcfromtimestamp(ts_ms / 1000.0).date().isoformat()
+        # CoinGecko returns many points per day; collapse to one per UTC day
+        # on the integer day number, and only build date strings once per day.
         try:
             mc_val = float(mc)
         except Exception:
             mc_val = 0.0
         # Keep the latest value for that date (or you could average)
-        out[dt] = mc_val
-    return out
+        by_day[int(ts_ms) // MS_PER_DAY] = mc_val
+    return {(EPOCH + timedelta(days=day)).isoformat(): mc_val for day, mc_val in by_day.items()}
 
 
 def build_history():
@@ -91,7 +81,6 @@ def build_history():
         series = fetch_mc_series(cid)
         per_token[sym] = series
         print(f"[backfill]   {sym}: {len(series)} daily points", flush=True)
-        time.sleep(1.2)  # be gentle with CG rate limits
 
     # Build the union of all dates where BTC has a value
     btc_dates = sorted(per_token["BTC"].keys())
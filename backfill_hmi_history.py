@@ -21,18 +21,19 @@ One-time backfill for HMI:
 """
 
 import os
-import time
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
-import requests
 import pandas as pd
 import numpy as np
+from http_utils import make_session
 
 COINALYZE_BASE = "https://api.coinalyze.net/v1"
 BINANCE_SPOT_BASE = "https://api.binance.com"
 BINANCE_FUTURES_BASE = "https://fapi.binance.com"
 
+SESSION = make_session(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+
 COINALYZE_API_KEY = os.getenv("COINALYZE_API_KEY")
 if COINALYZE_API_KEY is None:
     raise RuntimeError("COINALYZE_API_KEY not set in environment.")
@@ -48,6 +49,9 @@ OUT_DIR = Path("data")
 OUT_DIR.mkdir(exist_ok=True)
 OUT_CSV = OUT_DIR / "hmi_oi_history.csv"
 
+EPOCH = date(1970, 1, 1)
+MS_PER_DAY = 86_400_000
+
 
 # -------- UTIL --------
 
@@ -55,32 +59,46 @@ def iso_to_unix(date_str: str) -> int:
     return int(datetime.strptime(date_str, "%Y-%m-%d").timestamp())
 
 
-def unix_to_date(ts: int):
-    return datetime.utcfromtimestamp(ts).date()
+def coinalyze_history_frame(js, value_key: str, col: str) -> pd.DataFrame:
+    """
+    Flatten a Coinalyze history payload for SYMBOL_PERP_COINALYZE into
+    (date, col), converting the unix-second timestamps in one pass.
+    """
+    hist = [h for item in js if item.get("symbol") == SYMBOL_PERP_COINALYZE
+            for h in item.get("history", [])]
+    raw = pd.DataFrame(hist, columns=["t", value_key])
+    return pd.DataFrame({
+        "date": pd.to_datetime(raw["t"].astype("int64"), unit="s").dt.date,
+        col: raw[value_key].astype(float),
+    })
 
 
-def coinalyze_get(path: str, params=None, sleep: float = 0.25):
+def coinalyze_get(path: str, params=None):
     if params is None:
         params = {}
 
     url = COINALYZE_BASE + path
     params = {**params, "api_key": COINALYZE_API_KEY}
 
-    r = requests.get(url, params=params, timeout=60)
+    r = SESSION.get(url, params=params, timeout=60)
     if r.status_code != 200:
         raise RuntimeError(f"Coinalyze error {r.status_code}: {r.text[:300]}")
-    time.sleep(sleep)
     return r.json()
 
 
-def bn_spot_get_klines(symbol: str, interval: str, limit: int = 1000):
+def bn_spot_get_klines(symbol: str, interval: str, limit: int = 1000,
+                       start_ms: int = None, end_ms: int = None):
     url = BINANCE_SPOT_BASE + "/api/v3/klines"
     params = {
         "symbol": symbol,
         "interval": interval,
         "limit": limit,
     }
-    r = requests.get(url, params=params, timeout=60)
+    if start_ms is not None:
+        params["startTime"] = start_ms
+    if end_ms is not None:
+        params["endTime"] = end_ms
+    r = SESSION.get(url, params=params, timeout=60)
     if r.status_code != 200:
         raise RuntimeError(f"Binance spot error {r.status_code}: {r.text[:300]}")
     return r.json()
@@ -90,7 +108,7 @@ def bn_futures_get(path: str, params=None):
     if params is None:
         params = {}
     url = BINANCE_FUTURES_BASE + path
-    r = requests.get(url, params=params, timeout=60)
+    r = SESSION.get(url, params=params, timeout=60)
     if r.status_code != 200:
         raise RuntimeError(f"Binance futures error {r.status_code}: {r.text[:300]}")
     return r.json()
@@ -118,16 +136,7 @@ def fetch_global_oi_and_perp_volume(start_date, end_date):
         },
     )
 
-    oi_rows = []
-    for item in js_oi:
-        if item.get("symbol") != SYMBOL_PERP_COINALYZE:
-            continue
-        for h in item.get("history", []):
-            d = unix_to_date(int(h["t"]))
-            oi_usd = float(h["c"])
-            oi_rows.append((d, oi_usd))
-
-    oi_df = pd.DataFrame(oi_rows, columns=["date", "global_oi_usd"])
+    oi_df = coinalyze_history_frame(js_oi, "c", "global_oi_usd")
 
     # Perp volume (Coinalyze's 'v' as notional volume)
     js_vol = coinalyze_get(
@@ -140,16 +149,7 @@ def fetch_global_oi_and_perp_volume(start_date, end_date):
         },
     )
 
-    vol_rows = []
-    for item in js_vol:
-        if item.get("symbol") != SYMBOL_PERP_COINALYZE:
-            continue
-        for h in item.get("history", []):
-            d = unix_to_date(int(h["t"]))
-            v = float(h["v"])
-            vol_rows.append((d, v))
-
-    vol_df = pd.DataFrame(vol_rows, columns=["date", "global_perp_vol"])
+    vol_df = coinalyze_history_frame(js_vol, "v", "global_perp_vol")
 
     df = oi_df.merge(vol_df, on="date", how="inner").sort_values("date")
     df["date"] = df["date"].astype("datetime64[ns]").dt.date
@@ -159,22 +159,26 @@ def fetch_global_oi_and_perp_volume(start_date, end_date):
 def fetch_spot_history_from_binance(start_date, end_date):
     """
     Fetch ~730d spot daily candles for BTCUSDT from Binance.
-    Binance allows up to 1000 klines per request, so we can fetch in one go.
+    Binance allows up to 1000 klines per request, so we can fetch in one go,
+    asking only for the backfill window.
     """
-    klines = bn_spot_get_klines(SPOT_SYMBOL, "1d", limit=1000)
-
-    rows = []
-    for k in klines:
-        # k: [open_time, open, high, low, close, volume, close_time, quote_volume, ...]
-        open_time_ms = k[0]
-        date = datetime.utcfromtimestamp(open_time_ms / 1000.0).date()
-        if not (start_date <= date <= end_date):
-            continue
-        close = float(k[4])
-        quote_volume = float(k[7])  # quote asset volume
-        rows.append((date, close, quote_volume))
-
-    df = pd.DataFrame(rows, columns=["date", "spot_close", "spot_volume"])
+    # Window bounds in ms so out-of-range rows are skipped before any date is built
+    start_ms = (start_date - EPOCH).days * MS_PER_DAY
+    end_ms = ((end_date - EPOCH).days + 1) * MS_PER_DAY - 1
+
+    klines = bn_spot_get_klines(SPOT_SYMBOL, "1d", limit=1000,
+                                start_ms=start_ms, end_ms=end_ms)
+
+    # k: [open_time, open, high, low, close, volume, close_time, quote_volume, ...]
+    raw = pd.DataFrame(klines).reindex(columns=[0, 4, 7])
+    open_time_ms = raw[0].astype("int64")
+    raw = raw[(open_time_ms >= start_ms) & (open_time_ms <= end_ms)]
+
+    df = pd.DataFrame({
+        "date": pd.to_datetime(raw[0].astype("int64"), unit="ms").dt.date,
+        "spot_close": raw[4].astype(float),
+        "spot_volume": raw[7].astype(float),  # quote asset volume
+    })
     df["date"] = df["date"].astype("datetime64[ns]").dt.date
     df = df.drop_duplicates("date").sort_values("date")
     return df
@@ -21,16 +21,15 @@ equity_curve_fg_dom.csv untouched.
 """
 
 import os
-import time
 import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 from pathlib import Path
 
-import requests
 import pandas as pd
 import numpy as np
 
-COINGECKO_BASE = "https://api.coingecko.com/api/v3"
+from cg_utils import cg_get
 
 # Live start date for Hive:
 DESIRED_START_DATE = "2025-11-10"
@@ -46,52 +45,50 @@ INITIAL_CAPITAL = 100.0
 
 RISK_IDS = ["bitcoin", "ethereum", "solana", "binancecoin"]
 
+CG_MAX_DAYS = 365  # CoinGecko free-tier history limit
 
-# ---------- HELPERS ----------
+EPOCH = date(1970, 1, 1)
+MS_PER_DAY = 86_400_000
 
-def cg_get(path, params=None, sleep=1.2):
-    if params is None:
-        params = {}
-    url = COINGECKO_BASE + path
-    r = requests.get(url, params=params, timeout=60)
-    if r.status_code != 200:
-        raise RuntimeError(f"CoinGecko error {r.status_code}: {r.text[:300]}")
-    time.sleep(sleep)
-    return r.json()
 
+# ---------- HELPERS ----------
 
 def fetch_cg_ohlc_and_mc(coin_id, start_date, end_date):
     """
     Use /market_chart to get daily prices + market caps.
 
-    We pass `days=365` (CoinGecko free limit), then filter records
+    We ask for just enough days back from today to cover start_date
+    (capped at 365, the CoinGecko free limit), then filter records
     to [start_date, end_date].
     """
     start_dt = datetime.strptime(start_date, "%Y-%m-%d").date()
     end_dt   = datetime.strptime(end_date, "%Y-%m-%d").date()
 
+    # [start_date, end_date] as ms bounds, so rows are filtered before any date is built
+    start_ms = (start_dt - EPOCH).days * MS_PER_DAY
+    end_ms   = ((end_dt - EPOCH).days + 1) * MS_PER_DAY
+
+    # `days` counts back from now; pin daily granularity so short windows
+    # don't switch to hourly points
+    days = min(CG_MAX_DAYS, (datetime.utcnow().date() - start_dt).days + 1)
     js = cg_get(
         f"/coins/{coin_id}/market_chart",
-        params={"vs_currency": "usd", "days": "365"}
+        params={"vs_currency": "usd", "days": str(max(days, 1)), "interval": "daily"}
     )
-    rows = []
-    prices = js.get("prices", [])
-    mcs    = js.get("market_caps", [])
-
-    mc_map = {}
-    for ts, mc in mcs:
-        d = datetime.utcfromtimestamp(ts / 1000.0).date()
-        mc_map[d] = mc
-
-    for ts, price in prices:
-        d = datetime.utcfromtimestamp(ts / 1000.0).date()
-        if not (start_dt <= d <= end_dt):
-            continue
-        mc = mc_map.get(d, np.nan)
-        rows.append((d, price, mc))
-
-    df = pd.DataFrame(rows, columns=["date", f"{coin_id}_price", f"{coin_id}_mc"])
-    df = df.drop_duplicates("date").sort_values("date")
+    price_col, mc_col = f"{coin_id}_price", f"{coin_id}_mc"
+    prices = pd.DataFrame(js.get("prices", []), columns=["ts", price_col])
+    mcs    = pd.DataFrame(js.get("market_caps", []), columns=["ts", mc_col])
+
+    prices = prices[(prices["ts"] >= start_ms) & (prices["ts"] < end_ms)]
+    prices["date"] = pd.to_datetime(prices["ts"], unit="ms").dt.date
+    mcs["date"]    = pd.to_datetime(mcs["ts"], unit="ms").dt.date
+
+    # First price of each day, last market cap of each day
+    df = prices[["date", price_col]].drop_duplicates("date").merge(
+        mcs[["date", mc_col]].drop_duplicates("date", keep="last"),
+        on="date", how="left",
+    )
+    df = df.sort_values("date")
     return df
 
 
@@ -134,16 +131,13 @@ def compute_dynamic_dom_bands(dom_series: pd.Series):
       - DOM_35–DOM_65       : mid-zone (stables)
       - dominance >= DOM_65 : ALTs side
     """
-    s = dom_series.dropna()
-    if len(s) < 50:
+    arr = dom_series.dropna().to_numpy(dtype=np.float64)
+    if arr.size < 50:
         raise RuntimeError("Not enough data to compute dynamic dominance bands (need >= 50 points).")
 
-    # Robust min/max using near-extreme quantiles to avoid single-point outliers
-    DOM_MIN = float(s.quantile(0.01))
-    DOM_MAX = float(s.quantile(0.99))
-
-    DOM_35 = float(s.quantile(0.35))
-    DOM_65 = float(s.quantile(0.65))
+    # Robust min/max using near-extreme quantiles to avoid single-point outliers;
+    # all four cut points come from a single partition of the data
+    DOM_MIN, DOM_35, DOM_65, DOM_MAX = (float(q) for q in np.quantile(arr, [0.01, 0.35, 0.65, 0.99]))
 
     # Ensure ordering just in case of numerical ties
     DOM_MIN = min(DOM_MIN, DOM_35, DOM_65)
@@ -154,8 +148,9 @@ def compute_dynamic_dom_bands(dom_series: pd.Series):
 
 def allocation_from_dom_and_hmi(btc_dom, hmi, dom_bands):
     """
-    Returns target weights: dict(btc, alts, stables),
-    BTC dominance in [0,1], HMI in [0,100].
+    Returns target weights: dict(btc, alts, stables) of arrays aligned
+    with the inputs, BTC dominance in [0,1], HMI in [0,100].
+    Works on whole series at once (scalars give 0-d arrays).
 
     dom_bands = (DOM_MIN, DOM_35, DOM_65, DOM_MAX)
 
@@ -169,34 +164,36 @@ def allocation_from_dom_and_hmi(btc_dom, hmi, dom_bands):
     (DOM_35 < dom < DOM_65) we override to 100% stables.
     """
     DOM_MIN, DOM_35, DOM_65, DOM_MAX = dom_bands
+    btc_dom = np.asarray(btc_dom, dtype=np.float64)
+    hmi = np.asarray(hmi, dtype=np.float64)
 
-    # 1) Greed override from HMI
-    if hmi >= GREED_STABLE_THRESHOLD:
-        return {"btc": 0.0, "alts": 0.0, "stables": 1.0}
+    # 1) Greed override from HMI, 2) mid stables zone
+    stables = (hmi >= GREED_STABLE_THRESHOLD) | ((DOM_35 < btc_dom) & (btc_dom < DOM_65))
 
-    # 2) Mid stables zone
-    if DOM_35 < btc_dom < DOM_65:
-        return {"btc": 0.0, "alts": 0.0, "stables": 1.0}
-
-    # Guard against degenerate cases
     if DOM_MAX <= DOM_MIN:
         # Fallback to equal weights in a degenerate scenario
-        return {"btc": 0.5, "alts": 0.5, "stables": 0.0}
-
-    # 3) Linear BTC->ALTs schedule ignoring mid-zone
-    # Map dominance to [0,1] along the full dynamic range
-    t_raw = (btc_dom - DOM_MIN) / (DOM_MAX - DOM_MIN)
-    t_raw = max(0.0, min(1.0, t_raw))
-
-    # Linear weights across the *entire* range:
-    # t=0   -> 100% BTC, 0% ALTs
-    # t=0.5 -> 50/50
-    # t=1   -> 0% BTC, 100% ALTs
-    btc_w = 1.0 - t_raw
-    alt_w = t_raw
+        btc_w = np.full(btc_dom.shape, 0.5)
+        alt_w = np.full(btc_dom.shape, 0.5)
+    else:
+        # 3) Linear BTC->ALTs schedule ignoring mid-zone
+        # Map dominance to [0,1] along the full dynamic range
+        # (a NaN dominance clamps to 1, as the old scalar min/max did)
+        t_raw = (btc_dom - DOM_MIN) / (DOM_MAX - DOM_MIN)
+        t_raw = np.clip(np.nan_to_num(t_raw, nan=1.0), 0.0, 1.0)
+
+        # Linear weights across the *entire* range:
+        # t=0   -> 100% BTC, 0% ALTs
+        # t=0.5 -> 50/50
+        # t=1   -> 0% BTC, 100% ALTs
+        btc_w = 1.0 - t_raw
+        alt_w = t_raw
 
     # Outside the stables band we honour this linear schedule
-    return {"btc": btc_w, "alts": alt_w, "stables": 0.0}
+    return {
+        "btc": np.where(stables, 0.0, btc_w),
+        "alts": np.where(stables, 0.0, alt_w),
+        "stables": stables.astype(np.float64),
+    }
 
 
 # ---------- BUILD MARKET DATA ----------
@@ -205,17 +202,17 @@ def build_market_data(eff_start_str, eff_end_str):
     print(f"Fetching CoinGecko data for BTC, ETH, SOL, BNB… "
           f"({eff_start_str} → {eff_end_str})")
 
-    frames = []
-    for cid in RISK_IDS:
-        df = fetch_cg_ohlc_and_mc(cid, eff_start_str, eff_end_str)
-        frames.append(df)
+    with ThreadPoolExecutor(max_workers=len(RISK_IDS)) as ex:
+        frames = list(ex.map(
+            lambda cid: fetch_cg_ohlc_and_mc(cid, eff_start_str, eff_end_str).set_index("date"),
+            RISK_IDS,
+        ))
 
     if not frames:
         raise RuntimeError("No market data frames returned from CoinGecko.")
 
-    df = frames[0]
-    for sub in frames[1:]:
-        df = df.merge(sub, on="date", how="inner")
+    # Dates are unique per frame, so one aligned inner concat replaces a merge chain
+    df = pd.concat(frames, axis=1, join="inner").reset_index()
 
     if df.empty:
         raise RuntimeError("No overlapping market data between assets.")
@@ -232,6 +229,7 @@ def build_market_data(eff_start_str, eff_end_str):
     df["eth_price"] = df["ethereum_price"]
     df["sol_price"] = df["solana_price"]
     df["bnb_price"] = df["binancecoin_price"]
+    df["alt_price"] = (df["eth_price"] + df["sol_price"] + df["bnb_price"]) / 3.0
 
     return df
 
@@ -291,52 +289,39 @@ def run_backtest():
     DOM_BANDS_JSON.write_text(json.dumps(bands_payload, indent=2))
     print(f"Wrote {DOM_BANDS_JSON} with dynamic dominance bands.")
 
-    # Portfolio starts all in stables
-    btc_units   = 0.0
-    alt_units   = 0.0
-    stable_usd  = INITIAL_CAPITAL
-
-    equity_hist = []
+    dates   = df["date"].to_numpy()
+    btc_p   = df["btc_price"].to_numpy(dtype=np.float64)
+    alt_p   = df["alt_price"].to_numpy(dtype=np.float64)
+    btc_dom = df["btc_dom"].to_numpy(dtype=np.float64)
+    hmi     = df["HMI"].to_numpy(dtype=np.float64)
+
+    # Target allocation for every day from dominance + HMI using dynamic bands
+    w = allocation_from_dom_and_hmi(btc_dom, hmi, dom_bands)
+
+    # The portfolio starts all in stables and is fully rebalanced to the
+    # day's weights at that day's close, so equity grows each day by
+    #   w_btc[t-1]*btc_p[t]/btc_p[t-1] + w_alts[t-1]*alt_p[t]/alt_p[t-1] + w_stables[t-1]
+    # (a zero price on the rebalance day means no units were bought).
+    btc_gross = np.divide(btc_p[1:], btc_p[:-1], out=np.zeros(len(btc_p) - 1), where=btc_p[:-1] > 0)
+    alt_gross = np.divide(alt_p[1:], alt_p[:-1], out=np.zeros(len(alt_p) - 1), where=alt_p[:-1] > 0)
+    growth = w["btc"][:-1] * btc_gross + w["alts"][:-1] * alt_gross + w["stables"][:-1]
+    # Fully-stable days hold flat regardless of prices (a NaN price would otherwise leak in)
+    growth = np.where(w["stables"][:-1] == 1.0, 1.0, growth)
+    equity = INITIAL_CAPITAL * np.concatenate(([1.0], np.cumprod(growth)))
 
     # BTC-only: invest 100 in BTC on the first day, then hold
-    btc_only_units = None
-
-    for _, row in df.iterrows():
-        date_row = row["date"]
-        btc_price = row["btc_price"]
-        alt_price = (row["ethereum_price"] + row["solana_price"] + row["binancecoin_price"]) / 3.0
-
-        # Current equity
-        equity = btc_units * btc_price + alt_units * alt_price + stable_usd
-
-        # BTC-only benchmark: buy once on the first day
-        if btc_only_units is None:
-            btc_only_units = INITIAL_CAPITAL / btc_price
-        btc_only_equity = btc_only_units * btc_price
-
-        # Decide target allocation from dominance + HMI using dynamic bands
-        w = allocation_from_dom_and_hmi(row["btc_dom"], row["HMI"], dom_bands)
-        target_btc_usd    = equity * w["btc"]
-        target_alt_usd    = equity * w["alts"]
-        target_stable_usd = equity * w["stables"]
-
-        # Rebalance
-        btc_units   = target_btc_usd / btc_price if btc_price > 0 else 0.0
-        alt_units   = target_alt_usd / alt_price if alt_price > 0 else 0.0
-        stable_usd  = target_stable_usd
-
-        equity_hist.append({
-            "date": date_row,
-            "equity": equity,
-            "btc_only": btc_only_equity,
-            "btc_dom": row["btc_dom"],
-            "HMI": row["HMI"],
-            "w_btc": w["btc"],
-            "w_alts": w["alts"],
-            "w_stables": w["stables"],
-        })
-
-    res = pd.DataFrame(equity_hist)
+    btc_only = INITIAL_CAPITAL * btc_p / btc_p[0]
+
+    res = pd.DataFrame({
+        "date": dates,
+        "equity": equity,
+        "btc_only": btc_only,
+        "btc_dom": btc_dom,
+        "HMI": hmi,
+        "w_btc": w["btc"],
+        "w_alts": w["alts"],
+        "w_stables": w["stables"],
+    })
     res.to_csv(OUT_CSV_EQUITY, index=False)
 
     print("\n=== SUMMARY ===")
@@ -0,0 +1,82 @@
+import os
+import time
+import gzip
+import json
+import hashlib
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from http_utils import make_session
+
+COINGECKO_BASE = "https://api.coingecko.com/api/v3"
+
+# Free-tier budget shared by all threads: at most CG_RATE_CALLS requests per
+# CG_RATE_PERIOD seconds. Calls within budget go out at once; only a burst past it waits.
+CG_RATE_CALLS = 30
+CG_RATE_PERIOD = 60.0  # seconds
+_CG_CALL_TIMES = deque()
+_CG_RATE_LOCK = threading.Lock()
+
+# Responses are cached on disk per (path, params, UTC day)
+CG_CACHE_DIR = Path(".cache/coingecko")
+CG_CACHE_TTL = 6 * 3600  # seconds
+
+SESSION = make_session(total=5, backoff_factor=1, status_forcelist=[429, 502, 503], pool_maxsize=4)
+
+
+def _cg_cache_path(path, params):
+    key = json.dumps([path, sorted(params.items()), datetime.utcnow().date().isoformat()])
+    return CG_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.json.gz"
+
+
+def _cg_cache_write(cache_file, js):
+    # Write to a temp file and rename, so a crash never leaves a truncated entry
+    CG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CG_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(gzip.compress(json.dumps(js).encode()))
+        os.replace(tmp, cache_file)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _cg_rate_limit():
+    with _CG_RATE_LOCK:
+        now = time.monotonic()
+        while _CG_CALL_TIMES and now - _CG_CALL_TIMES[0] >= CG_RATE_PERIOD:
+            _CG_CALL_TIMES.popleft()
+        if len(_CG_CALL_TIMES) >= CG_RATE_CALLS:
+            time.sleep(CG_RATE_PERIOD - (now - _CG_CALL_TIMES[0]))
+            _CG_CALL_TIMES.popleft()
+        _CG_CALL_TIMES.append(time.monotonic())
+
+
+def cg_get(path, params=None, timeout=60):
+    if params is None:
+        params = {}
+
+    cache_file = _cg_cache_path(path, params)
+    try:
+        if cache_file.exists() and time.time() - cache_file.stat().st_mtime < CG_CACHE_TTL:
+            return json.loads(gzip.decompress(cache_file.read_bytes()))
+    except Exception as e:
+        # An unreadable entry is just a miss; the fresh payload overwrites it
+        print("CoinGecko cache read error:", e)
+
+    url = COINGECKO_BASE + path
+    _cg_rate_limit()
+    r = SESSION.get(url, params=params, timeout=timeout)
+    if r.status_code != 200:
+        raise RuntimeError(f"CoinGecko error {r.status_code}: {r.text[:300]}")
+    js = r.json()
+
+    try:
+        _cg_cache_write(cache_file, js)
+    except Exception as e:
+        print("CoinGecko cache write error:", e)
+    return js
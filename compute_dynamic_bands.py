@@ -9,16 +9,16 @@ Writes:
     docs/dom_bands_latest.json   with keys: min_pct, max_pct
 """
 
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import requests
 import pandas as pd
 
+from cg_utils import cg_get
+
 DOCS = Path("docs")
 DOCS.mkdir(exist_ok=True, parents=True)
 OUT = DOCS / "dom_bands_latest.json"
 
-COINGECKO = "https://api.coingecko.com/api/v3"
 DAYS = 730
 
 IDS = {
@@ -29,16 +29,6 @@ IDS = {
 }
 
 
-def cg_get(path, params=None, timeout=60):
-    if params is None:
-        params = {}
-    url = COINGECKO + path
-    r = requests.get(url, params=params, timeout=timeout)
-    if r.status_code != 200:
-        raise RuntimeError(f"CoinGecko error {r.status_code}: {r.text[:200]}")
-    return r.json()
-
-
 def fetch_mc(coin_id: str) -> pd.DataFrame:
     js = cg_get(
         f"/coins/{coin_id}/market_chart",
@@ -48,23 +38,20 @@ def fetch_mc(coin_id: str) -> pd.DataFrame:
     if not data:
         return pd.DataFrame(columns=["date", "mc"])
     df = pd.DataFrame(data, columns=["ts", "mc"])
-    df["date"] = df["ts"].apply(lambda t: datetime.utcfromtimestamp(t/1000.0).date())
+    df["date"] = pd.to_datetime(df["ts"], unit="ms").dt.date
     return df[["date", "mc"]].drop_duplicates("date").sort_values("date")
 
 
 def main():
-    frames = {}
-    for sym, cid in IDS.items():
-        frames[sym] = fetch_mc(cid)
-
-    # Merge on date
-    df = frames["BTC"].rename(columns={"mc": "btc_mc"})
-    for sym in ["ETH", "BNB", "SOL"]:
-        df = df.merge(
-            frames[sym].rename(columns={"mc": f"{sym.lower()}_mc"}),
-            on="date",
-            how="inner"
-        )
+    with ThreadPoolExecutor(max_workers=len(IDS)) as ex:
+        frames = dict(zip(IDS, ex.map(fetch_mc, IDS.values())))
+
+    # Align on date: one inner concat of the per-coin market-cap columns
+    df = pd.concat(
+        {f"{sym.lower()}_mc": frames[sym].set_index("date")["mc"] for sym in IDS},
+        axis=1,
+        join="inner",
+    )
 
     if df.empty:
         raise SystemExit("No overlapping MC data for BTC/ETH/BNB/SOL")
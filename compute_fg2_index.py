@@ -24,16 +24,19 @@ Pipeline:
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-import requests
 import pandas as pd
 import numpy as np
+from http_utils import make_session
 
 BINANCE_SPOT_BASE = "https://api.binance.com"
 BINANCE_FUTURES_BASE = "https://fapi.binance.com"
 
+SESSION = make_session(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+
 SPOT_SYMBOL = "BTCUSDT"
 DATA_CSV = Path("data/hmi_oi_history.csv")
 
@@ -41,6 +44,9 @@ OUT_DIR = Path("output")
 OUT_DIR.mkdir(exist_ok=True)
 OUT_CSV = OUT_DIR / "fg2_daily.csv"
 
+EPOCH = date(1970, 1, 1)
+MS_PER_DAY = 86_400_000
+
 HMI_JSON_ROOT = Path("hmi_latest.json")
 HMI_JSON_DOCS = Path("docs/hmi_latest.json")
 Path("docs").mkdir(exist_ok=True)
@@ -51,7 +57,7 @@ Path("docs").mkdir(exist_ok=True)
 def bn_spot_get_klines(symbol: str, interval: str, limit: int = 1):
     url = BINANCE_SPOT_BASE + "/api/v3/klines"
     params = {"symbol": symbol, "interval": interval, "limit": limit}
-    r = requests.get(url, params=params, timeout=60)
+    r = SESSION.get(url, params=params, timeout=60)
     if r.status_code != 200:
         raise RuntimeError(f"Binance spot error {r.status_code}: {r.text[:300]}")
     return r.json()
@@ -61,7 +67,7 @@ def bn_futures_get(path: str, params=None):
     if params is None:
         params = {}
     url = BINANCE_FUTURES_BASE + path
-    r = requests.get(url, params=params, timeout=60)
+    r = SESSION.get(url, params=params, timeout=60)
     if r.status_code != 200:
         raise RuntimeError(f"Binance futures error {r.status_code}: {r.text[:300]}")
     return r.json()
@@ -74,30 +80,34 @@ def fetch_today_spot_and_perps():
     Returns:
         (date, spot_close, spot_quote_volume, perp_quote_volume, oi_usd)
     """
+    # The three requests are independent, so issue them concurrently
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        spot_f = ex.submit(bn_spot_get_klines, SPOT_SYMBOL, "1d", limit=1)
+        perp_f = ex.submit(bn_futures_get, "/fapi/v1/klines", params={
+            "symbol": SPOT_SYMBOL,
+            "interval": "1d",
+            "limit": 1,
+        })
+        oi_f = ex.submit(bn_futures_get, "/fapi/v1/openInterest", params={"symbol": SPOT_SYMBOL})
+        spot_kl, perp_kl, oi_js = spot_f.result(), perp_f.result(), oi_f.result()
+
     # Spot daily kline
-    spot_kl = bn_spot_get_klines(SPOT_SYMBOL, "1d", limit=1)
     if not spot_kl:
         raise RuntimeError("No BTCUSDT spot kline returned.")
     sk = spot_kl[-1]
     # [open_time, open, high, low, close, volume, close_time, quote_volume, ...]
-    open_time_ms = sk[0]
-    d = datetime.utcfromtimestamp(open_time_ms / 1000.0).date()
+    open_time_ms = int(sk[0])
+    d = EPOCH + timedelta(days=open_time_ms // MS_PER_DAY)
     spot_close = float(sk[4])
     spot_quote_vol = float(sk[7])
 
     # Perps daily kline
-    perp_kl = bn_futures_get("/fapi/v1/klines", params={
-        "symbol": SPOT_SYMBOL,
-        "interval": "1d",
-        "limit": 1,
-    })
     if not perp_kl:
         raise RuntimeError("No BTCUSDT perps kline returned.")
     pk = perp_kl[-1]
     perp_quote_vol = float(pk[7])
 
     # Current open interest (contracts)
-    oi_js = bn_futures_get("/fapi/v1/openInterest", params={"symbol": SPOT_SYMBOL})
     oi_contracts = float(oi_js["openInterest"])
     oi_usd = oi_contracts * spot_close
 
@@ -110,6 +120,30 @@ def clip01(x):
     return np.minimum(1, np.maximum(0, x))
 
 
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling sample std (ddof=1) via running sums, matching Series.rolling(window).std():
+    NaN until the window is full and wherever it holds a non-finite value.
+    Daily log returns are small, so the sum-of-squares form loses no precision here.
+    """
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+
+    valid = np.isfinite(x)
+    xz = np.where(valid, x, 0.0)
+    cs = np.concatenate(([0.0], np.cumsum(xz)))
+    cs2 = np.concatenate(([0.0], np.cumsum(xz * xz)))
+    cn = np.concatenate(([0], np.cumsum(valid)))
+
+    s = cs[window:] - cs[:-window]
+    s2 = cs2[window:] - cs2[:-window]
+    n = cn[window:] - cn[:-window]
+    var = np.maximum((s2 - s * s / window) / (window - 1), 0.0)
+    out[window - 1:] = np.where(n == window, np.sqrt(var), np.nan)
+    return out
+
+
 def rolling_minmax(series: pd.Series, window: int = 365, lower_q: float = 0.05, upper_q: float = 0.95):
     """
     Rolling quantile low/high with a fixed window, requiring full window.
@@ -135,9 +169,12 @@ def compute_fg_lite(df: pd.DataFrame):
     eps = 1e-9
 
     # volatility: log returns of spot_close
-    df["log_ret"] = np.log(df["spot_close"] / df["spot_close"].shift(1))
-    df["RV_30"] = df["log_ret"].rolling(30).std() * np.sqrt(365)
-    df["RV_90"] = df["log_ret"].rolling(90).std() * np.sqrt(365)
+    log_close = np.log(df["spot_close"].to_numpy(dtype=np.float64))
+    log_ret = np.full_like(log_close, np.nan)
+    log_ret[1:] = np.diff(log_close)
+    df["log_ret"] = log_ret
+    df["RV_30"] = rolling_std(log_ret, 30) * np.sqrt(365)
+    df["RV_90"] = rolling_std(log_ret, 90) * np.sqrt(365)
 
     V_raw = df["RV_90"] / (df["RV_30"] + eps)
     V_low, V_high = rolling_minmax(V_raw, window=365)
@@ -0,0 +1,19 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def make_session(total: int, backoff_factor: float, status_forcelist,
+                 pool_maxsize: int = 8) -> requests.Session:
+    # Keep-alive session for GETs. 429/5xx answers are retried with backoff
+    # (waiting out any Retry-After), then returned so the caller's own
+    # status-code check still raises its usual error
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=total, backoff_factor=backoff_factor,
+                          status_forcelist=status_forcelist, allowed_methods=["GET"],
+                          raise_on_status=False),
+    ))
+    return session
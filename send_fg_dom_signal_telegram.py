@@ -47,7 +47,7 @@ import os
 import time
 import hmac
 import hashlib
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any, Tuple, List
 
@@ -60,6 +60,9 @@ from dotenv import load_dotenv
 
 BINANCE_SPOT = "https://api.binance.com"
 
+EPOCH = date(1970, 1, 1)
+MS_PER_DAY = 86_400_000
+
 ROOT = Path(".")
 DOCS = ROOT / "docs"
 DOCS.mkdir(exist_ok=True, parents=True)
@@ -382,9 +385,9 @@ def fetch_price_history(symbol: str,
     )
     out: Dict[datetime.date, float] = {}
     for k in data:
-        open_time_ms = k[0]
+        open_time_ms = int(k[0])
         close_price = float(k[4])
-        d = datetime.utcfromtimestamp(open_time_ms / 1000.0).date()
+        d = EPOCH + timedelta(days=open_time_ms // MS_PER_DAY)
         out[d] = close_price
     return out
 